@@ -5,7 +5,7 @@ C++ Project Structure Analyzer
 Analyzes C++ project structure to extract module information, dependencies, and build targets.
 
 Usage:
-    python analyze_project.py <project_root> [--output json|text]
+    python analyze_project.py <project_root> [--output json|text] [--jobs N]
 
 Example:
     python analyze_project.py /path/to/project --output json
@@ -15,12 +15,19 @@ import os
 import re
 import json
 import argparse
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Iterator, Tuple
 from dataclasses import dataclass, field, asdict
 
+try:
+    # Scan headers for namespaces with google-re2 when it is installed
+    import re2 as regex_engine
+except ImportError:
+    regex_engine = re
 
-@dataclass
+
+@dataclass(slots=True)
 class Module:
     """Project module information"""
     name: str
@@ -30,7 +37,7 @@ class Module:
     dependencies: List[str] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class BuildTarget:
     """CMake build target"""
     name: str
@@ -38,7 +45,7 @@ class BuildTarget:
     sources: List[str] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class ProjectInfo:
     """Project information summary"""
     name: str = ""
@@ -48,6 +55,19 @@ class ProjectInfo:
     external_deps: List[str] = field(default_factory=list)
 
 
+# Regexes for CMakeLists.txt (CMake identifiers are ASCII)
+PROJECT_PATTERN = re.compile(r'project\s*\(\s*(\w+)', re.IGNORECASE | re.ASCII)
+CXX_STANDARD_PATTERN = re.compile(r'CMAKE_CXX_STANDARD\s+(\d+)', re.ASCII)
+ADD_TARGET_PATTERN = re.compile(r'add_(executable|library)\s*\(\s*(\w+)', re.IGNORECASE | re.ASCII)
+FIND_PACKAGE_PATTERN = re.compile(r'find_package\s*\(\s*(\w+)', re.IGNORECASE | re.ASCII)
+
+# Regex for namespace declaration (bytes, so \w only matches ASCII identifiers)
+NAMESPACE_PATTERN = regex_engine.compile(rb'namespace\s+(\w+(?:::\w+)*)\s*\{')
+
+# Minimum number of headers before scanning is spread across processes
+MIN_PARALLEL_FILES = 32
+
+
 def parse_cmake(cmake_path: Path) -> Dict[str, Any]:
     """Parse CMakeLists.txt to extract build information"""
     info = {
@@ -63,37 +83,79 @@ def parse_cmake(cmake_path: Path) -> Dict[str, Any]:
     content = cmake_path.read_text(encoding='utf-8', errors='ignore')
     
     # Project name
-    match = re.search(r'project\s*\(\s*(\w+)', content, re.IGNORECASE)
+    match = PROJECT_PATTERN.search(content)
     if match:
         info["project_name"] = match.group(1)
     
     # C++ standard
-    match = re.search(r'CMAKE_CXX_STANDARD\s+(\d+)', content)
+    match = CXX_STANDARD_PATTERN.search(content)
     if match:
         info["cpp_standard"] = match.group(1)
     
     # Build targets
-    for match in re.finditer(r'add_(executable|library)\s*\(\s*(\w+)', content, re.IGNORECASE):
+    for match in ADD_TARGET_PATTERN.finditer(content):
         info["targets"].append({
             "type": match.group(1).lower(),
             "name": match.group(2)
         })
     
     # External dependencies
-    for match in re.finditer(r'find_package\s*\(\s*(\w+)', content, re.IGNORECASE):
+    for match in FIND_PACKAGE_PATTERN.finditer(content):
         info["find_packages"].append(match.group(1))
     
     return info
 
 
-def scan_headers(include_dir: Path) -> Dict[str, Module]:
+# Copy of walk_files() from find_key_functions.py, kept local because the
+# scripts do not import each other.
+def walk_files(directory: Path, extensions: Tuple[str, ...]) -> Iterator[Path]:
+    """Recursively yield files with the given extensions in a single pass"""
+    subdirs = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif entry.name.endswith(extensions):
+                    yield Path(entry.path)
+    except OSError:
+        # Unreadable directory: skip it, as Path.rglob does
+        return
+    # Files of a directory come before those of its subdirectories
+    for subdir in subdirs:
+        yield from walk_files(Path(subdir), extensions)
+
+
+def read_namespace(header: Path) -> str:
+    """Extract the first namespace declared in a header"""
+    try:
+        content = header.read_bytes()
+    except Exception:
+        return ""
+    # Cheap substring check before running the regex
+    if b'namespace' not in content:
+        return ""
+    ns_match = NAMESPACE_PATTERN.search(content)
+    return ns_match.group(1).decode('utf-8', errors='ignore') if ns_match else ""
+
+
+def scan_headers(include_dir: Path, jobs: Optional[int] = None) -> Dict[str, Module]:
     """Scan headers directory to identify modules"""
     modules: Dict[str, Module] = {}
     
     if not include_dir.exists():
         return modules
     
-    for header in include_dir.rglob("*.hpp"):
+    headers = list(walk_files(include_dir, ('.hpp',)))
+    
+    # Worker processes only pay off once there is enough regex work to spread
+    if jobs == 1 or len(headers) < MIN_PARALLEL_FILES:
+        namespaces = list(map(read_namespace, headers))
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            namespaces = list(executor.map(read_namespace, headers, chunksize=16))
+    
+    for header, namespace in zip(headers, namespaces):
         # Infer module name from path
         relative = header.relative_to(include_dir)
         parts = relative.parts
@@ -108,14 +170,9 @@ def scan_headers(include_dir: Path) -> Dict[str, Module]:
         
         modules[module_name].headers.append(str(relative))
         
-        # Try to extract namespace
-        try:
-            content = header.read_text(encoding='utf-8', errors='ignore')
-            ns_match = re.search(r'namespace\s+(\w+(?:::\w+)*)\s*\{', content)
-            if ns_match and not modules[module_name].namespace:
-                modules[module_name].namespace = ns_match.group(1)
-        except Exception:
-            pass
+        # Keep the first namespace found for the module
+        if namespace and not modules[module_name].namespace:
+            modules[module_name].namespace = namespace
     
     return modules
 
@@ -127,14 +184,16 @@ def scan_sources(src_dir: Path) -> List[str]:
     if not src_dir.exists():
         return sources
     
-    for ext in ['*.cpp', '*.cc', '*.cxx']:
-        for src in src_dir.rglob(ext):
-            sources.append(str(src.relative_to(src_dir)))
+    found = list(walk_files(src_dir, ('.cpp', '.cc', '.cxx')))
+    for ext in ['.cpp', '.cc', '.cxx']:
+        for src in found:
+            if src.name.endswith(ext):
+                sources.append(str(src.relative_to(src_dir)))
     
     return sources
 
 
-def analyze_project(project_root: str) -> ProjectInfo:
+def analyze_project(project_root: str, jobs: Optional[int] = None) -> ProjectInfo:
     """Analyze the entire project"""
     root = Path(project_root)
     info = ProjectInfo()
@@ -157,7 +216,7 @@ def analyze_project(project_root: str) -> ProjectInfo:
     for inc_dir in include_dirs:
         inc_path = root / inc_dir
         if inc_path.exists():
-            modules = scan_headers(inc_path)
+            modules = scan_headers(inc_path, jobs)
             info.modules.extend(modules.values())
             break
     
@@ -208,14 +267,18 @@ def main():
     parser.add_argument("project_root", help="Project root directory path")
     parser.add_argument("--output", choices=["json", "text"], default="text",
                        help="Output format")
+    parser.add_argument("--jobs", type=int, default=None,
+                       help="Number of worker processes (default: CPU count)")
     
     args = parser.parse_args()
+    if args.jobs is not None and args.jobs < 1:
+        parser.error("--jobs must be at least 1")
     
     if not os.path.isdir(args.project_root):
         print(f"Error: Directory does not exist: {args.project_root}")
         return 1
     
-    info = analyze_project(args.project_root)
+    info = analyze_project(args.project_root, args.jobs)
     print(format_output(info, args.output))
     return 0
 
@@ -5,7 +5,7 @@ C++ Key Function Finder
 Scans C++ headers to identify key functions and categorize them by priority.
 
 Usage:
-    python find_key_functions.py <include_dir> [--output json|text]
+    python find_key_functions.py <include_dir> [--output json|text] [--jobs N] [--max-size BYTES]
 
 Example:
     python find_key_functions.py /path/to/project/include --output json
@@ -13,14 +13,30 @@ Example:
 
 import os
 import re
+import sys
+import bisect
 import json
 import argparse
+import functools
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any
-from dataclasses import dataclass, field, asdict
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+from dataclasses import dataclass, field
 
+try:
+    # Optional: google-re2 guarantees linear-time matching on large headers
+    import re2 as regex_engine
+except ImportError:
+    regex_engine = re
 
-@dataclass
+try:
+    # Optional: orjson serializes large function lists much faster than json
+    import orjson
+except ImportError:
+    orjson = None
+
+
+@dataclass(slots=True)
 class FunctionInfo:
     """Function information"""
     name: str
@@ -61,75 +77,91 @@ KEYWORD_PATTERNS = {
     }
 }
 
-# Regex for function signature
-FUNCTION_PATTERN = re.compile(
-    r'''
-    (?:virtual\s+)?                     # virtual (optional)
-    (?:static\s+)?                      # static (optional)
-    (?:inline\s+)?                      # inline (optional)
-    ([\w:<>,\s\*&]+?)                   # Return type
-    \s+
-    ([\w~]+)                            # Function name
-    \s*
-    \(([^)]*)\)                         # Parameters
-    \s*
-    (?:const)?                          # const (optional)
-    (?:\s*noexcept)?                    # noexcept (optional)
-    (?:\s*override)?                    # override (optional)
-    \s*
-    (?:;|=|\{)                          # End of signature
-    ''',
-    re.VERBOSE | re.MULTILINE
+# One alternation regex per category, tried in KEYWORD_PATTERNS order so that
+# a higher-priority keyword anywhere in the name wins over a lower one
+CATEGORY_PATTERNS = [
+    (re.compile("|".join(map(re.escape, config["keywords"]))),
+     config["priority"], config["category"])
+    for config in KEYWORD_PATTERNS.values()
+]
+
+# Regex for function signature (bytes: headers are scanned undecoded).
+# Written without re.VERBOSE so the same pattern compiles under re2.
+FUNCTION_PATTERN = regex_engine.compile(
+    rb'(?:\bvirtual\s+)?'                        # virtual (optional)
+    rb'(?:\bstatic\s+)?'                         # static (optional)
+    rb'(?:\binline\s+)?'                         # inline (optional)
+    rb'((?:\b\w|[:<>,\s\*&])'                    # Return type, starting on a token
+    rb'[\w:<>,\s\*&]{0,199}?)'                   # boundary and bounded to cap backtracking
+    rb'\s+'
+    rb'([\w~]+)'                                 # Function name
+    rb'\s*'
+    rb'\(([^)]*)\)'                              # Parameters
+    rb'\s*'
+    rb'(?:const)?'                               # const (optional)
+    rb'(?:\s*noexcept)?'                         # noexcept (optional)
+    rb'(?:\s*override)?'                         # override (optional)
+    rb'\s*'
+    rb'(?:;|=|\{)'                               # End of signature
 )
 
 # Regex for class definition
-CLASS_PATTERN = re.compile(r'(?:class|struct)\s+(\w+)\s*(?::\s*[^{]+)?\s*\{')
+CLASS_PATTERN = regex_engine.compile(rb'(?:class|struct)\s+(\w+)\s*(?::\s*[^{]+)?\s*\{')
+
+# Minimum number of headers before scanning is spread across processes
+MIN_PARALLEL_FILES = 32
+
+# Headers larger than this (bytes) are assumed generated and skipped
+MAX_HEADER_SIZE = 2 * 1024 * 1024
 
 
+@functools.lru_cache(maxsize=8192)
 def classify_function(name: str) -> tuple[str, str]:
-    """Categorize functions based on name"""
+    """Categorize functions based on name (cached: names repeat heavily)"""
     name_lower = name.lower()
     
-    for category_name, config in KEYWORD_PATTERNS.items():
-        for keyword in config["keywords"]:
-            if keyword in name_lower:
-                return config["priority"], config["category"]
+    for pattern, priority, category in CATEGORY_PATTERNS:
+        if pattern.search(name_lower):
+            return priority, category
     
     return "P3", "utility"
 
 
-def extract_functions(file_path: Path) -> List[FunctionInfo]:
+def extract_functions(file_path: Path, max_size: int = MAX_HEADER_SIZE) -> List[FunctionInfo]:
     """Extract functions from a header file"""
     functions = []
     
     try:
-        content = file_path.read_text(encoding='utf-8', errors='ignore')
+        if file_path.stat().st_size > max_size:
+            print(f"Note: skipping {file_path} (larger than {max_size} bytes)",
+                  file=sys.stderr)
+            return functions
+        content = file_path.read_bytes()
     except Exception:
         return functions
     
-    lines = content.split('\n')
-    current_class = None
-    brace_depth = 0
+    # No parenthesis means no function signature to find
+    if b'(' not in content:
+        return functions
     
-    # Simplified class tracking
-    for i, line in enumerate(lines, 1):
-        # Track class definitions
-        class_match = CLASS_PATTERN.search(line)
-        if class_match:
-            current_class = class_match.group(1)
-            brace_depth = 0
-        
-        # Track braces
-        brace_depth += line.count('{') - line.count('}')
-        if brace_depth <= 0:
-            current_class = None
-            brace_depth = 0
+    # Universal newlines, as read_text() would give: keeps CRLF out of
+    # signatures and makes CR-only files count lines correctly
+    if b'\r' in content:
+        content = content.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+    
+    # Class definitions, ordered by end offset
+    class_matches = list(CLASS_PATTERN.finditer(content))
+    class_ends = [m.end() for m in class_matches]
+    class_names = [m.group(1).decode('utf-8', errors='ignore') for m in class_matches]
     
-    # Re-scan to extract functions
+    line_num = 1
+    line_pos = 0
+    
+    # Extract functions
     for match in FUNCTION_PATTERN.finditer(content):
-        return_type = match.group(1).strip()
-        func_name = match.group(2).strip()
-        params = match.group(3).strip()
+        return_type = match.group(1).strip().decode('utf-8', errors='ignore')
+        func_name = match.group(2).strip().decode('utf-8', errors='ignore')
+        params = match.group(3).strip().decode('utf-8', errors='ignore')
         
         # Skip constructors/destructors
         if func_name.startswith('~') or return_type == func_name:
@@ -139,14 +171,13 @@ def extract_functions(file_path: Path) -> List[FunctionInfo]:
         if func_name.startswith('operator'):
             continue
         
-        # Calculate line number
-        line_num = content[:match.start()].count('\n') + 1
+        # Calculate line number (matches arrive in order, so count incrementally)
+        line_num += content.count(b'\n', line_pos, match.start())
+        line_pos = match.start()
         
-        # Attempt to determine parent class
-        class_name = ""
-        search_pos = match.start()
-        for class_match in CLASS_PATTERN.finditer(content[:search_pos]):
-            class_name = class_match.group(1)
+        # Attempt to determine parent class: last class defined before the match
+        idx = bisect.bisect_right(class_ends, match.start()) - 1
+        class_name = class_names[idx] if idx >= 0 else ""
         
         full_name = f"{class_name}::{func_name}" if class_name else func_name
         priority, category = classify_function(func_name)
@@ -167,21 +198,47 @@ def extract_functions(file_path: Path) -> List[FunctionInfo]:
     return functions
 
 
-def scan_directory(include_dir: str) -> List[FunctionInfo]:
+# Same walker as in analyze_project.py; the scripts stay standalone, so
+# changes here must be mirrored there.
+def walk_files(directory: Path, extensions: Tuple[str, ...]) -> Iterator[Path]:
+    """Recursively yield files with the given extensions in a single pass"""
+    subdirs = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif entry.name.endswith(extensions):
+                    yield Path(entry.path)
+    except OSError:
+        # Unreadable directory: skip it, as Path.rglob does
+        return
+    # Files of a directory come before those of its subdirectories
+    for subdir in subdirs:
+        yield from walk_files(Path(subdir), extensions)
+
+
+def scan_directory(include_dir: str, jobs: Optional[int] = None,
+                   max_size: int = MAX_HEADER_SIZE) -> List[FunctionInfo]:
     """Scan all header files in a directory"""
     all_functions = []
     root = Path(include_dir)
     
-    for header in root.rglob("*.hpp"):
-        functions = extract_functions(header)
-        # Update relative path
-        for func in functions:
-            func.file = str(header.relative_to(root))
-        all_functions.extend(functions)
+    # Collect .hpp files first, then .h files
+    found = list(walk_files(root, ('.hpp', '.h')))
+    headers = ([h for h in found if h.name.endswith('.hpp')] +
+               [h for h in found if h.name.endswith('.h')])
+    
+    # Worker processes only pay off once there is enough regex work to spread
+    if jobs == 1 or len(headers) < MIN_PARALLEL_FILES:
+        results = [extract_functions(header, max_size) for header in headers]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(extract_functions, headers,
+                                        [max_size] * len(headers), chunksize=16))
     
-    # Also scan .h files
-    for header in root.rglob("*.h"):
-        functions = extract_functions(header)
+    for header, functions in zip(headers, results):
+        # Update relative path
         for func in functions:
             func.file = str(header.relative_to(root))
         all_functions.extend(functions)
@@ -191,17 +248,36 @@ def scan_directory(include_dir: str) -> List[FunctionInfo]:
 
 def format_output(functions: List[FunctionInfo], format: str) -> str:
     """Format output results"""
-    # Sort by priority
-    sorted_funcs = sorted(functions, key=lambda f: (f.priority, f.category, f.name))
+    # Bucket by priority, then sort each bucket by category and name
+    groups: Dict[str, List[FunctionInfo]] = {"P0": [], "P1": [], "P2": [], "P3": []}
+    for func in functions:
+        groups[func.priority].append(func)
+    for group in groups.values():
+        group.sort(key=lambda f: (f.category, f.name))
     
     if format == "json":
-        return json.dumps([asdict(f) for f in sorted_funcs], indent=2, ensure_ascii=False)
+        # Flat fields only, so skip asdict()'s recursive deep copy
+        records = [
+            {
+                "name": f.name,
+                "full_name": f.full_name,
+                "file": f.file,
+                "line": f.line,
+                "signature": f.signature,
+                "return_type": f.return_type,
+                "priority": f.priority,
+                "category": f.category,
+            }
+            for group in groups.values()
+            for f in group
+        ]
+        if orjson is not None:
+            return orjson.dumps(records, option=orjson.OPT_INDENT_2).decode('utf-8')
+        return json.dumps(records, indent=2, ensure_ascii=False)
     else:
         lines = ["# Key Functions List", ""]
         
-        # Group by priority
-        for priority in ["P0", "P1", "P2", "P3"]:
-            group = [f for f in sorted_funcs if f.priority == priority]
+        for priority, group in groups.items():
             if not group:
                 continue
             
@@ -217,20 +293,22 @@ def format_output(functions: List[FunctionInfo], format: str) -> str:
                 ""
             ])
             
+            # One string per function; the trailing newline leaves the blank separator line
             for func in group:
-                lines.append(f"- `{func.full_name}` [{func.file}:{func.line}]")
-                lines.append(f"  - Signature: `{func.signature}`")
-                lines.append(f"  - Category: {func.category}")
-                lines.append("")
+                lines.append(
+                    f"- `{func.full_name}` [{func.file}:{func.line}]\n"
+                    f"  - Signature: `{func.signature}`\n"
+                    f"  - Category: {func.category}\n"
+                )
         
         # Statistics
         lines.extend([
             "---",
             f"Total: {len(functions)} functions",
-            f"  P0: {len([f for f in functions if f.priority == 'P0'])}",
-            f"  P1: {len([f for f in functions if f.priority == 'P1'])}",
-            f"  P2: {len([f for f in functions if f.priority == 'P2'])}",
-            f"  P3: {len([f for f in functions if f.priority == 'P3'])}",
+            f"  P0: {len(groups['P0'])}",
+            f"  P1: {len(groups['P1'])}",
+            f"  P2: {len(groups['P2'])}",
+            f"  P3: {len(groups['P3'])}",
         ])
         
         return "\n".join(lines)
@@ -241,14 +319,22 @@ def main():
     parser.add_argument("include_dir", help="Include directory path")
     parser.add_argument("--output", choices=["json", "text"], default="text",
                        help="Output format")
+    parser.add_argument("--jobs", type=int, default=None,
+                       help="Number of worker processes (default: CPU count)")
+    parser.add_argument("--max-size", type=int, default=MAX_HEADER_SIZE,
+                       help="Skip headers larger than this many bytes")
     
     args = parser.parse_args()
+    if args.jobs is not None and args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.max_size < 0:
+        parser.error("--max-size must not be negative")
     
     if not os.path.isdir(args.include_dir):
         print(f"Error: Directory does not exist: {args.include_dir}")
         return 1
     
-    functions = scan_directory(args.include_dir)
+    functions = scan_directory(args.include_dir, args.jobs, args.max_size)
     print(format_output(functions, args.output))
     return 0
 
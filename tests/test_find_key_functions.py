@@ -0,0 +1,34 @@
+import re
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import find_key_functions  # noqa: E402
+
+
+class ReturnTypeBoundTest(unittest.TestCase):
+    """FUNCTION_PATTERN caps the return type; the cut must not split identifiers"""
+
+    def test_long_template_return_type_starts_on_token_boundary(self):
+        params = ",\n          ".join(f"typename AsyncWriteStream{i}" for i in range(12))
+        source = (
+            "// AbslHashValue for hashing std::unordered_multiset\n"
+            f"template <{params}>\n"
+            "typename std::enable_if<true, int>::type\n"
+            "async_write_some(AsyncWriteStream0& s, int n);\n"
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            header = Path(tmp) / "long.hpp"
+            header.write_text(source)
+            functions = find_key_functions.extract_functions(header)
+
+        self.assertEqual([f.name for f in functions], ["async_write_some"])
+        for token in re.findall(r"\w+", functions[0].return_type):
+            self.assertRegex(source, rf"\b{token}\b")
+
+
+if __name__ == "__main__":
+    unittest.main()